@@ -1,11 +1,25 @@
 import streamlit as st
-import random
 import time
-from collections import defaultdict
-import json
+import atexit
+import hashlib
+import hmac
+import html
+import threading
+import bisect
+import queue
+import os
+import contextlib
+from collections import Counter
+import orjson
 from datetime import datetime
+from itertools import takewhile
 import requests
-import urllib.parse
+from requests.adapters import HTTPAdapter
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; locking falls back to this process only
+    fcntl = None
 
 # Page configuration
 st.set_page_config(
@@ -20,101 +34,437 @@ st.set_page_config(
 JSONBIN_API_KEY = st.secrets.get("jsonbin_api_key", "")
 JSONBIN_BIN_ID = st.secrets.get("jsonbin_bin_id", "")
 
+# Voting closes at the end of the day on August 12th 2025
+DEADLINE = datetime(2025, 8, 12, 23, 59, 59)
+DEADLINE_TS = DEADLINE.timestamp()
+
+# Reads from JSONBin are shared across reruns for this long
+READ_CACHE_SECONDS = 10
+
+# After a failed read, leave JSONBin alone this long instead of retrying every rerun
+READ_BACKOFF_SECONDS = 30
+
+# Entered codes are hashed and checked against this with hmac.compare_digest, in constant time
+ADMIN_CODE_HASH = hashlib.blake2b(b"1320", digest_size=8).digest()
+
+# Saves arriving closer together than this are coalesced into one JSONBin write
+SAVE_DEBOUNCE_SECONDS = 1.5
+
+# Copy of the votes on this server's disk, used when JSONBin is unreachable or not set up -
+# kept in a directory only this app's user can write, since its contents are trusted as votes
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".folk_festival")
+DATA_FILE = os.path.join(DATA_DIR, "votes.json")
+
+@st.cache_resource
+def _jsonbin_client(api_key):
+    """Authenticated HTTP client for JSONBin.io, built once per server process"""
+    client = requests.Session()
+    # Every browser session runs its script on its own thread, so keep enough
+    # pooled keep-alive connections for them to share without new TLS handshakes
+    client.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    client.headers.update({
+        "X-Master-Key": api_key,
+        "Content-Type": "application/json"
+    })
+    return client
+
+@st.cache_resource
+def _last_fetch():
+    """Last read's ETag and record (for conditional GETs) and when reads may be retried"""
+    # fresh is (url, time, record) of the last good read, served as is for READ_CACHE_SECONDS
+    return {"url": None, "etag": None, "record": None, "unavailable_until": 0.0, "fresh": None}
+
+def _get_remote(url):
+    """Read the raw record from JSONBin.io, reusing the last one if it hasn't changed"""
+    # Ask for the bare record so the response skips the metadata envelope
+    headers = {"X-Bin-Meta": "false"}
+    last = _last_fetch()
+    if last["url"] == url and last["etag"]:
+        headers["If-None-Match"] = last["etag"]
+
+    response = _jsonbin_client(JSONBIN_API_KEY).get(url, headers=headers, timeout=10)
+    if response.status_code == 304:
+        # Unchanged since the last read - reuse it without parsing anything
+        return 200, last["record"]
+    if response.status_code != 200:
+        return response.status_code, None
+
+    record = orjson.loads(response.content)
+    if not isinstance(record, dict):
+        raise ValueError("stored record is not a JSON object")
+    etag = response.headers.get("ETag")
+    if etag:
+        last.update(url=url, etag=etag, record=record)
+    return response.status_code, record
+
+def _fetch_remote(url):
+    """Fetch the raw record from JSONBin.io, shared across reruns for a few seconds (don't mutate it)"""
+    # Hand every session the same parsed record rather than a fresh copy per rerun
+    last = _last_fetch()
+    fresh = last["fresh"]
+    if fresh is not None and fresh[0] == url and time.monotonic() - fresh[1] < READ_CACHE_SECONDS:
+        return 200, fresh[2]
+
+    status_code, record = _get_remote(url)
+    if status_code == 200:
+        last["fresh"] = (url, time.monotonic(), record)
+    return status_code, record
+
+def _expire_fetch():
+    """Make the next read go to JSONBin.io instead of reusing the shared record"""
+    _last_fetch()["fresh"] = None
+
+@st.cache_resource
+def _write_buffer():
+    """Process-wide queue of votes not yet written to JSONBin.io (shared by all sessions)"""
+    # lock guards the fields below; flush_lock makes flushes take turns.
+    # pending holds nomination events, written is (time, record) of the last write
+    # wake signals the background writer, failed is the status of a write still being retried
+    buffer = {"lock": threading.Lock(), "flush_lock": threading.Lock(), "wake": queue.Queue(),
+              "pending": [], "written": None, "failed": None}
+    threading.Thread(target=_save_worker, args=(buffer,), daemon=True).start()
+    # Don't lose a coalesced write when the server shuts down
+    atexit.register(flush_pending)
+    return buffer
+
+def _save_worker(buffer):
+    """Background writer: waits for queued votes and writes them out so reruns never block on a PUT"""
+    last_write = 0.0
+    while True:
+        buffer["wake"].get()
+        # A lone vote goes out straight away; right after a write, give the rest
+        # of the burst a moment to land so it goes out in one write
+        wait = last_write + SAVE_DEBOUNCE_SECONDS - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        while not buffer["wake"].empty():
+            buffer["wake"].get_nowait()
+
+        try:
+            status_code = flush_pending()
+        except Exception as e:
+            # This thread must never exit, or queued votes would sit unsaved for good -
+            # report whatever went wrong and retry after the backoff
+            status_code = f"{type(e).__name__}: {e}"
+        last_write = time.monotonic()
+        if status_code not in (None, 200):
+            # Keep the votes queued and try again after a pause
+            buffer["failed"] = status_code
+            time.sleep(READ_BACKOFF_SECONDS)
+            buffer["wake"].put(True)
+        else:
+            buffer["failed"] = None
+
+def _to_state(data):
+    """Convert a stored record into the in-memory session structures"""
+    if not isinstance(data, dict):
+        # e.g. the bin was hand-edited into a list in the JSONBin dashboard
+        raise ValueError("stored record is not a JSON object")
+    return {
+        'nominations': Counter(data.get('nominations', {})),
+        'nominators': set(data.get('nominators', [])),
+        'write_in_candidates': set(data.get('write_in_candidates', [])),
+        'nomination_reasons': {k: list(v) for k, v in data.get('nomination_reasons', {}).items()}
+    }
+
+def _to_record(state):
+    """Convert in-memory state back into the JSON record stored in the bin (shares state's objects)"""
+    return {
+        # orjson writes a Counter as a plain object, so no dict() copy is needed
+        'nominations': state['nominations'],
+        'nominators': sorted(state['nominators']),
+        'write_in_candidates': sorted(state['write_in_candidates']),
+        'nomination_reasons': state['nomination_reasons']
+    }
+
+def _apply_event(state, event):
+    """Apply a nomination or reset event to state in place; returns False if it changed nothing (e.g. a repeat voter)"""
+    if event.get("reset"):
+        changed = bool(state['nominations'] or state['nominators'] or state['write_in_candidates'])
+        state['nominations'] = Counter()
+        state['nominators'] = set()
+        state['write_in_candidates'] = set()
+        state['nomination_reasons'] = {}
+        return changed
+
+    if event["nominator"] in state['nominators']:
+        return False
+
+    nominee = event["nominee"]
+    state['nominators'].add(event["nominator"])
+    state['nominations'][nominee] += 1
+    # Store the reason (without the nominator's name)
+    if event["reason"]:
+        state['nomination_reasons'].setdefault(nominee, []).append(event["reason"])
+    if event["write_in"]:
+        state['write_in_candidates'].add(nominee)
+    return True
+
+@st.cache_resource
+def _local_copy():
+    """The (file key, parsed record) of the local copy, shared by all sessions"""
+    # Kept as one tuple so a reader never pairs a new file key with an old record
+    return {"entry": (None, None)}
+
+def _file_key(stat):
+    """What identifies one version of the local copy; mtime alone can repeat within a tick"""
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+def _read_local():
+    """Read the record saved on this server's disk, or None if there isn't a usable one (don't mutate it)"""
+    try:
+        file_key = _file_key(os.stat(DATA_FILE))
+    except OSError:
+        return None
+
+    # Only parse the file again when it has changed since the last read
+    local = _local_copy()
+    cached_key, record = local["entry"]
+    if cached_key != file_key:
+        record = _parse_local()
+        if record is None:
+            return None
+        local["entry"] = (file_key, record)
+    return record
+
+def _parse_local():
+    """Read and parse the local copy straight from disk, or None if there isn't a usable one"""
+    try:
+        with open(DATA_FILE, "rb") as f:
+            record = orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    return record if isinstance(record, dict) else None
+
+@contextlib.contextmanager
+def _local_file_lock():
+    """Hold an exclusive lock on the local copy across processes for a read-modify-write"""
+    os.makedirs(DATA_DIR, mode=0o700, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(f"{DATA_FILE}.lock", "wb") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _write_local(data):
+    """Save a record to this server's disk, replacing the old copy in one step (hold _local_file_lock())"""
+    # Write a temp file and swap it in, so a crash never leaves a half-written file
+    tmp_file = f"{DATA_FILE}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(data))
+        # One sync per save, before the swap, so the new file is on disk when it replaces the old one
+        f.flush()
+        os.fsync(f.fileno())
+        # Stat our own file, not the path after the swap (another process may have replaced it by then)
+        file_key = _file_key(os.fstat(f.fileno()))
+    os.replace(tmp_file, DATA_FILE)
+    # Keep the in-memory copy current so our own write isn't parsed back in
+    _local_copy()["entry"] = (file_key, data)
+
+def _put_remote(data):
+    """Write a full record to JSONBin.io and return the response status code"""
+    url = f"https://api.jsonbin.io/v3/b/{JSONBIN_BIN_ID}"
+    response = _jsonbin_client(JSONBIN_API_KEY).put(url, data=orjson.dumps(data), timeout=10)
+
+    if response.status_code == 200:
+        # Drop the cached read so the next rerun sees this write
+        _expire_fetch()
+    return response.status_code
+
+def flush_pending():
+    """Fold queued votes into the latest bin contents and write it back; returns the status code or None"""
+    buffer = _write_buffer()
+    with buffer["flush_lock"]:
+        with buffer["lock"]:
+            events = list(buffer["pending"])
+        if not events:
+            return None
+
+        # Re-read right before writing so votes saved elsewhere aren't overwritten
+        status_code, record = _get_remote(f"https://api.jsonbin.io/v3/b/{JSONBIN_BIN_ID}/latest")
+        if status_code != 200:
+            return status_code
+        state = _to_state(record)
+        changed = False
+        for event in events:
+            changed = _apply_event(state, event) or changed
+        new_record = _to_record(state)
+
+        # Skip the write (and the disk copy's fsync) when the events changed nothing,
+        # e.g. resetting empty data or a repeat voter from another server
+        if changed:
+            status_code = _put_remote(new_record)
+
+        if status_code == 200:
+            with buffer["lock"]:
+                del buffer["pending"][:len(events)]
+                buffer["written"] = (time.monotonic(), new_record)
+            if changed:
+                try:
+                    with _local_file_lock():
+                        _write_local(new_record)
+                except OSError:
+                    pass  # The disk copy is only a fallback; the bin has the votes
+
+        return status_code
+
 def load_data():
-    """Load data from JSONBin.io with fallback to session state"""
+    """Load data from JSONBin.io with fallback to the local copy, then session state"""
+    record = None
+    events = []
     try:
         if JSONBIN_API_KEY and JSONBIN_BIN_ID:
-            # Load from JSONBin.io
-            headers = {
-                "X-Master-Key": JSONBIN_API_KEY,
-                "Content-Type": "application/json"
-            }
-            url = f"https://api.jsonbin.io/v3/b/{JSONBIN_BIN_ID}/latest"
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json().get("record", {})
-                return {
-                    'nominations': defaultdict(int, data.get('nominations', {})),
-                    'nominators': data.get('nominators', []),
-                    'write_in_candidates': set(data.get('write_in_candidates', [])),
-                    'nomination_reasons': data.get('nomination_reasons', {})
-                }
+            buffer = _write_buffer()
+            with buffer["lock"]:
+                events = list(buffer["pending"])
+                written = buffer["written"]
+
+            # A record we just wrote is as fresh as the bin - serve it rather than reading it back
+            if written is not None and time.monotonic() - written[0] < READ_CACHE_SECONDS:
+                record = written[1]
             else:
-                st.warning(f"⚠️ Could not load data from storage (Status: {response.status_code})")
-    except Exception as e:
+                last = _last_fetch()
+                if time.monotonic() < last["unavailable_until"]:
+                    st.warning("⚠️ Storage unavailable - showing the last votes loaded (retrying shortly)")
+                else:
+                    # Load from JSONBin.io (cached, so rapid reruns share one request)
+                    url = f"https://api.jsonbin.io/v3/b/{JSONBIN_BIN_ID}/latest"
+                    status_code, data = _fetch_remote(url)
+                    
+                    if status_code == 200:
+                        record = data
+                    else:
+                        last["unavailable_until"] = time.monotonic() + READ_BACKOFF_SECONDS
+                        st.warning(f"⚠️ Could not load data from storage (Status: {status_code})")
+    except (requests.RequestException, ValueError, KeyError) as e:
+        _last_fetch()["unavailable_until"] = time.monotonic() + READ_BACKOFF_SECONDS
         st.warning(f"⚠️ Storage connection issue: {str(e)}")
-    
-    # Fallback to session state if available
-    if hasattr(st.session_state, 'nominations'):
+
+    if record is None and (not (JSONBIN_API_KEY and JSONBIN_BIN_ID) or 'nominations' not in st.session_state):
+        # JSONBin is not set up, or is unreachable and this session has nothing
+        # loaded yet - use the copy on this server's disk
+        record = _read_local()
+
+    # Nothing stored is reachable, or nothing has changed since this session last
+    # loaded (same shared record, same queue) - keep what the session already has
+    loaded_from = st.session_state.get('_loaded_from')
+    unchanged = record is not None and loaded_from is not None and loaded_from[0] is record and loaded_from[1] == len(events)
+    if (record is None or unchanged) and 'nominations' in st.session_state:
         return {
             'nominations': st.session_state.nominations,
             'nominators': st.session_state.nominators,
             'write_in_candidates': st.session_state.write_in_candidates,
             'nomination_reasons': st.session_state.nomination_reasons
         }
-    
-    # Default empty state
-    return {
-        'nominations': defaultdict(int),
-        'nominators': [],
-        'write_in_candidates': set(),
-        'nomination_reasons': {}
-    }
 
-def save_data():
-    """Save data to JSONBin.io and session state"""
+    # Votes still queued for the next write are newer than the bin
+    state = _to_state(record or {})
+    for event in events:
+        _apply_event(state, event)
+    if record is not None:
+        st.session_state._loaded_from = (record, len(events))
+    return state
+
+def _queued_nominator(buffer, nominator):
+    """Whether nominator is in the last write or the queued votes; call with buffer["lock"] held"""
+    voted = False
+    if buffer["written"] is not None:
+        # Written records keep nominators sorted, so a binary search finds the name
+        nominators = buffer["written"][1]["nominators"]
+        i = bisect.bisect_left(nominators, nominator)
+        voted = i < len(nominators) and nominators[i] == nominator
+    for event in buffer["pending"]:
+        if event.get("reset"):
+            voted = False
+        elif event["nominator"] == nominator:
+            voted = True
+    return voted
+
+def save_data(event):
+    """Save a nomination or reset event to JSONBin.io, or to the local copy without it"""
+    # The caller has changed session state, so the next load must rebuild it
+    st.session_state.pop('_loaded_from', None)
+    if "nominator" in event and time.time() >= DEADLINE_TS:
+        # A page loaded before the deadline can still submit after it
+        st.error("🔒 Voting has closed! Your nomination was not counted.")
+        return False
     try:
-        # Prepare data for storage
-        data = {
-            'nominations': dict(st.session_state.nominations),
-            'nominators': st.session_state.nominators,
-            'write_in_candidates': list(st.session_state.write_in_candidates),
-            'nomination_reasons': getattr(st.session_state, 'nomination_reasons', {})
-        }
-        
         if JSONBIN_API_KEY and JSONBIN_BIN_ID:
-            # Save to JSONBin.io
-            headers = {
-                "X-Master-Key": JSONBIN_API_KEY,
-                "Content-Type": "application/json"
-            }
-            url = f"https://api.jsonbin.io/v3/b/{JSONBIN_BIN_ID}"
-            response = requests.put(url, headers=headers, json=data, timeout=10)
-            
-            if response.status_code == 200:
-                return True  # Success
-            else:
-                st.error(f"❌ Failed to save data (Status: {response.status_code})")
-                return False
+            # Queue the event - the background writer sends it to the bin.
+            # Checking and queueing under one lock stops two sessions using
+            # the same name from both getting a vote in
+            buffer = _write_buffer()
+            with buffer["lock"]:
+                if "nominator" in event and _queued_nominator(buffer, event["nominator"]):
+                    st.error("🎵 You've already cast your nomination! One vote per person.")
+                    return False
+                buffer["pending"].append(event)
+            buffer["wake"].put(True)
+            return True
         else:
             st.warning("⚠️ No storage configured - data only saved locally")
+            # Fold the event into the local copy so every session on this server sees it
+            # The process lock orders this server's sessions, the file lock any other server process
+            with _write_buffer()["flush_lock"], _local_file_lock():
+                # Read past the cache: another process may have rewritten the file within
+                # the same mtime tick, and folding onto a stale copy would drop its vote
+                state = _to_state(_parse_local() or {})
+                if not _apply_event(state, event):
+                    if event.get("reset"):
+                        return True  # Already empty - nothing to write
+                    st.error("🎵 You've already cast your nomination! One vote per person.")
+                    return False
+                _write_local(_to_record(state))
             return True
             
     except Exception as e:
         st.error(f"❌ Data save error: {str(e)}")
         return False
 
-def get_current_leader():
-    """Get the current leader(s) in nominations"""
-    if not st.session_state.nominations:
+def get_current_leader(sorted_nominations):
+    """Get the current leader(s) from nominations already sorted by votes"""
+    if not sorted_nominations:
         return None, 0
-    
-    sorted_nominations = sorted(st.session_state.nominations.items(), 
-                              key=lambda x: x[1], reverse=True)
+    # Leaders are the prefix of the sorted list tied with the first entry
     top_votes = sorted_nominations[0][1]
-    leaders = [name for name, votes in sorted_nominations if votes == top_votes]
+    leaders = [name for name, _ in takewhile(lambda x: x[1] == top_votes, sorted_nominations)]
     return leaders, top_votes
 
-# Initialize session state with persistent data
-saved_data = load_data()
-st.session_state.nominations = saved_data['nominations']
-st.session_state.nominators = saved_data['nominators']
-st.session_state.write_in_candidates = saved_data['write_in_candidates']
-st.session_state.nomination_reasons = saved_data['nomination_reasons']
+def is_admin_code(code):
+    """Check an entered admin code against ADMIN_CODE_HASH in constant time"""
+    digest = hashlib.blake2b(code.encode(), digest_size=8).digest()
+    return hmac.compare_digest(digest, ADMIN_CODE_HASH)
+
+def stable_choice(options, *key):
+    """Pick from options deterministically, so the same key gives the same pick on every rerun"""
+    # A keyed hash stands in for a seeded RNG and skips building a Mersenne Twister per pick
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return options[int.from_bytes(digest, "big") % len(options)]
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def days_until_deadline():
+    """Whole days left before the deadline; only changes at midnight, so it's cached"""
+    return (DEADLINE.date() - datetime.now().date()).days
+
+def refresh_state():
+    """Load the latest shared data into session state"""
+    if JSONBIN_API_KEY and JSONBIN_BIN_ID:
+        failed = _write_buffer()["failed"]
+        if failed is not None:
+            st.warning(f"⚠️ Latest votes not saved yet (Status: {failed}) - retrying shortly")
+
+    saved_data = load_data()
+    st.session_state.nominations = saved_data['nominations']
+    st.session_state.nominators = saved_data['nominators']
+    st.session_state.write_in_candidates = saved_data['write_in_candidates']
+    st.session_state.nomination_reasons = saved_data['nomination_reasons']
 
 # Eligible nominees and profiles
-eligible_nominees = ["Bowe", "Drew", "Derek", "Emily", "Josh", "TallPaul", "Osc"]
+eligible_nominees = ("Bowe", "Drew", "Derek", "Emily", "Josh", "TallPaul", "Osc")
 nominee_profiles = {
     "Bowe": "Prefers the digital backdoor but this motherfucker loves a good challenge",
     "Drew": "This multifaceted wheelman has proven his worth on this front before!",
@@ -125,133 +475,250 @@ nominee_profiles = {
     "Osc": "In all honesty this man can probably just walk right past the guards in that smooth Osc fashion we all love and know"
 }
 
-folk_quotes = [
+folk_quotes = (
     "🎭 'She neva came!...' 🎭",
     "🪕 'I DID IT!' 🪕",
     "🎭 'I changed my shirt!' 🎭",
-]
+)
 
-def main():
-    # Header
-    st.title("🎵🏕️ PHILADELPHIA FOLK FESTIVAL EARLY INFILTRATION NOMINATION SYSTEM 🏕️🎵")
+# Message templates - filled in with .format(name=...) when shown
+reaction_templates = (
+    "😱 {name}: 'Wait, what?!'",
+    "😏 {name}: 'I should have seen this coming...'",
+    "🤷 {name}: 'Well, someone has to do it!'",
+    "😤 {name}: 'I'm getting you back for this!'",
+    "😌 {name}: 'Finally, recognition for my sneaking skills!'",
+)
 
-    # Check voting deadline
-    today = datetime.now()
-    deadline = datetime(2025, 8, 12, 23, 59, 59)  # End of day August 12th 2025
-    voting_open = today < deadline
-    days_until_deadline = (deadline.date() - today.date()).days
+victory_speech_templates = (
+    "🎤 {name}: 'I'd like to thank my agent, my coffee maker, and whoever nominated me...'",
+    "🎤 {name}: 'This is either the greatest honor or the worst luck of my life!'",
+    "🎤 {name}: 'I promise to sneak responsibly and secure that campsite!'",
+    "🎤 {name}: 'Greg, I hope you have a good alarm clock!'",
+    "🎤 {name}: 'Well, someone had to do it. Might as well be me!'",
+)
 
-    st.markdown("---")
+folk_wisdom = (
+    "🎵 Remember: 'The times they are a-changin'... but the campsite tradition stays the same!' 🎵",
+    "🎸 'Blowin' in the wind' is just the morning breeze at 4:30 AM! 🎸",
+    "🪕 'This land is your land'... but this campsite is OURS! 🪕",
+    "🎺 'We shall overcome'... the security guards and claim our spot! 🎺",
+)
 
-    # Mission briefing
-    with st.expander("🎪 THE MISSION BRIEFING", expanded=True):
-        st.markdown(f"""
-        **Welcome to the annual tradition nobody wants but somebody must do!**
+position_emojis = ("🥇", "🥈", "🥉", "🏅", "🎖️", "🏆", "⭐", "🌟")
 
-        Every year, two brave souls must sneak into the festival early (normally it comes down to - who's going with Greg!?)
-        to secure the sacred campsite that has been our home away from home.
+# Coloured status line by vote count: 0, 1, then 2 or more
+vote_statuses = (
+    "<span style='color:green'>😅 Safe for now</span>",
+    "<span style='color:orange'>⚠️ In the running</span>",
+    "<span style='color:red'>🚨 DANGER ZONE! 🚨</span>",
+)
 
-        🎪 **The Mission:** Arrive before dawn, act casual, claim the spot  
-        🎸 **The Risk:** Getting caught by security and having to explain why  
-        🏕️ **The Reward:** Being a hero... and internal bragging rights of course  
+@st.fragment
+def voting_form():
+    """Sidebar nomination form; typing here only reruns this fragment"""
+    # Checked here rather than passed in: a fragment rerun reuses the arguments of the
+    # last full run, which may be from before the deadline
+    voting_open = time.time() < DEADLINE_TS
+
+    if voting_open:
+        # Pick up votes cast elsewhere before checking who has already voted
+        refresh_state()
+    # Once voting has closed, the quote comes from the votes this session already holds
+    nominations = st.session_state.get("nominations")
+    total_votes = sum(nominations.values()) if nominations else 0
+
+    st.header("🗳️ CAST YOUR NOMINATION")
+    st.markdown(stable_choice(folk_quotes, "quote", total_votes))
+
+    # Show the reaction to a nomination cast just before the last rerun
+    vote_flash = st.session_state.pop("vote_flash", None)
+    if vote_flash:
+        for kind, text in vote_flash["messages"]:
+            getattr(st, kind)(text)
+        if vote_flash["balloons"]:
+            st.balloons()
+
+    if voting_open:
+        # Nominator name
+        nominator = st.text_input("👤 Your name, brave nominator:", 
+                                 placeholder="Enter your name")
+
+        if nominator:
+            # Build nominee options in one go; write-ins are sorted so the options
+            # (and so the selectbox) stay the same from one rerun to the next
+            options = ["-- Select someone --", *eligible_nominees, *sorted(st.session_state.write_in_candidates)]
+            if nominator not in options:
+                options.append(nominator)  # Self-nomination option
+            options.append("Write in new candidate")
+
+            # Nominee selection
+            st.markdown("**Choose your nominee:**")
+            nominee_choice = st.selectbox("Select a nominee:", options, key="nominee_select")
+
+            # Write-in option
+            write_in_name = None
+            if nominee_choice == "Write in new candidate":
+                write_in_name = st.text_input("✏️ Enter write-in candidate name:")
+                if write_in_name:
+                    nominee_choice = write_in_name
+
+            # Reasoning
+            reason = st.text_area("💭 Why this nominee? (Optional)", 
+                                placeholder="They seem like the obvious choice!")
+
+            # Submit nomination
+            if st.button("🎯 CAST NOMINATION", type="primary") and nominee_choice != "-- Select someone --":
+                event = {
+                    "nominator": nominator,
+                    "nominee": nominee_choice,
+                    "reason": reason.strip() if reason else "",
+                    "write_in": bool(write_in_name),
+                }
+                # New nomination (the event is ignored for someone who already voted)
+                if _apply_event(st.session_state, event):
+                    # Save to persistent storage
+                    if save_data(event):
+                        # Queue the reaction so it is shown after the rerun below
+                        if nominee_choice == nominator:
+                            messages = [("success", f"🦸 {nominator} bravely nominates themselves!")]
+                        else:
+                            reaction = stable_choice(reaction_templates, nominator, nominee_choice)
+                            messages = [
+                                ("success", f"🎯 {nominator} nominates {nominee_choice}!"),
+                                ("info", reaction.format(name=nominee_choice)),
+                            ]
+
+                        if reason:
+                            messages.append(("write", f"💭 *'{reason}'*"))
+
+                        st.session_state.vote_flash = {
+                            "messages": messages,
+                            "balloons": nominee_choice == nominator,
+                        }
+
+                        # Refresh the page to update results (no need to wait on the save)
+                        st.rerun()
+                else:
+                    st.error("🎵 You've already cast your nomination! One vote per person.")
+    else:
+        st.warning("🔒 Voting has closed!")
+        st.info("The nomination period ended on Tuesday, August 12th, 2025")
+
+@st.cache_data(show_spinner=False)
+def roster_markdown():
+    """Build the nominee roster and its footnotes as one markdown block (the roster never changes)"""
+    roster_rows = [f"| {i} | **{nominee}** | *{nominee_profiles[nominee]}* |"
+                   for i, nominee in enumerate(eligible_nominees, 1)]
+    return "\n\n".join([
+        "| # | Nominee | Profile |\n|---|---|---|\n" + "\n".join(roster_rows),
+        "🖊️ *Write-in candidates welcome! (In case we forgot someone important)*",
+        "🤔 *Remember: Amp is busy with mothering Wolfie*",
+        "⏰ *Dome, Micky and baby Wanda won't arrive in time*",
+    ])
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_leaderboard(sorted_nominations, write_in_candidates, reasons):
+    """Build the live results markdown once per distinct set of votes (reasons line up with sorted_nominations)"""
+    blocks = []
+    for i, ((nominee, votes), nominee_reasons) in enumerate(zip(sorted_nominations, reasons)):
+        emoji = position_emojis[min(i, len(position_emojis)-1)]
+        vote_text = "vote" if votes == 1 else "votes"
+
+        # Names and reasons are user input, so escape them since the block allows HTML
+        lines = [
+            f"{emoji} **{html.escape(nominee)}**: {votes} {vote_text}",
+            vote_statuses[min(votes, len(vote_statuses)-1)],
+        ]
 
-        **Let the nominations begin! May the odds be ever in someone else's favor.**
-        
-        ⏰ **Voting Deadline:** Tuesday, August 12th, 2025 at 11:59 PM
-        {"🗳️ **Status:** VOTING OPEN" if voting_open else "🔒 **Status:** VOTING CLOSED"}
-        {f"({days_until_deadline} days remaining)" if voting_open and days_until_deadline > 0 else ""}
-        """)
+        if nominee in write_in_candidates:
+            lines.append("📝 *(Write-in candidate - thinking outside the tent!)*")
 
-    # Auto-refresh every 10 seconds to get latest votes
-    if st.button("🔄 Refresh Results", help="Click to see latest votes from all devices"):
-        st.rerun()
+        # Show nomination reasons (without names)
+        for reason in nominee_reasons:
+            lines.append(f"💭 *\"{html.escape(reason)}\"*")
 
-    # Add auto-refresh timer
-    placeholder = st.empty()
-    with placeholder.container():
-        st.info("📱 App auto-refreshes to sync votes across all devices")
+        blocks.append("\n\n".join(lines))
 
-    # Sidebar for nominations
-    with st.sidebar:
-        st.header("🗳️ CAST YOUR NOMINATION")
-        st.markdown(random.choice(folk_quotes))
-
-        if voting_open:
-            # Nominator name
-            nominator = st.text_input("👤 Your name, brave nominator:", 
-                                     placeholder="Enter your name")
-
-            if nominator:
-                # Build nominee options
-                all_nominees = eligible_nominees.copy()
-                all_nominees.extend(list(st.session_state.write_in_candidates))
-                all_nominees.append(nominator)  # Self-nomination option
-
-                # Nominee selection
-                st.markdown("**Choose your nominee:**")
-                nominee_choice = st.selectbox(
-                    "Select a nominee:",
-                    ["-- Select someone --"] + all_nominees + ["Write in new candidate"],
-                    key="nominee_select"
-                )
-
-                # Write-in option
-                write_in_name = None
-                if nominee_choice == "Write in new candidate":
-                    write_in_name = st.text_input("✏️ Enter write-in candidate name:")
-                    if write_in_name:
-                        nominee_choice = write_in_name
-
-                # Reasoning
-                reason = st.text_area("💭 Why this nominee? (Optional)", 
-                                    placeholder="They seem like the obvious choice!")
-
-                # Submit nomination
-                if st.button("🎯 CAST NOMINATION", type="primary") and nominee_choice != "-- Select someone --":
-                    if nominator not in st.session_state.nominators:
-                        # New nomination
-                        st.session_state.nominators.append(nominator)
-                        st.session_state.nominations[nominee_choice] += 1
-
-                        # Store the reason (without the nominator's name)
-                        if reason and reason.strip():
-                            if 'nomination_reasons' not in st.session_state:
-                                st.session_state.nomination_reasons = {}
-                            if nominee_choice not in st.session_state.nomination_reasons:
-                                st.session_state.nomination_reasons[nominee_choice] = []
-                            st.session_state.nomination_reasons[nominee_choice].append(reason.strip())
-
-                        if write_in_name:
-                            st.session_state.write_in_candidates.add(write_in_name)
-
-                        # Save to persistent storage
-                        if save_data():
-                            # Show reaction
-                            if nominee_choice == nominator:
-                                st.success(f"🦸 {nominator} bravely nominates themselves!")
-                                st.balloons()
-                            else:
-                                reactions = [
-                                    f"😱 {nominee_choice}: 'Wait, what?!'",
-                                    f"😏 {nominee_choice}: 'I should have seen this coming...'",
-                                    f"🤷 {nominee_choice}: 'Well, someone has to do it!'",
-                                    f"😤 {nominee_choice}: 'I'm getting you back for this!'",
-                                    f"😌 {nominee_choice}: 'Finally, recognition for my sneaking skills!'"
-                                ]
-                                st.success(f"🎯 {nominator} nominates {nominee_choice}!")
-                                st.info(random.choice(reactions))
-
-                            if reason:
-                                st.write(f"💭 *'{reason}'*")
-
-                            # Refresh the page to update results
-                            time.sleep(1)  # Brief pause to ensure save completes
-                            st.rerun()
-                    else:
-                        st.error("🎵 You've already cast your nomination! One vote per person.")
+    # One markdown element for the whole leaderboard
+    return "\n\n".join(blocks)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def announcement(leaders, top_votes, voting_open):
+    """Work out the winner announcement once per standing; returns the chosen one and (kind, text) messages"""
+    messages = [("header", "🎭 THE MOMENT OF TRUTH... SO FAR! 🎭"), ("markdown", "🎪" * 30)]
+
+    if not voting_open:
+        # Voting is closed - final results
+        if len(leaders) == 1:
+            chosen_one = leaders[0]
+            messages.append(("success", "🏆 FINAL WINNER!"))
+            messages.append(("success", f"🎉 **{chosen_one}** has been selected by popular vote with {top_votes} votes!"))
+        else:
+            # Handle final tie with dramatic selection
+            # Sorted so every session breaks the tie the same way, whatever order it counted votes in
+            chosen_one = stable_choice(sorted(leaders), "winner", *sorted(leaders))
+            messages.append(("info", f"🤝 FINAL TIE! {len(leaders)} brave souls with {top_votes} votes each!"))
+            messages.append(("success", "🎯 THE DICE HAVE SPOKEN!"))
+            messages.append(("success", f"🏆 **{chosen_one}** has been randomly selected as the final winner!"))
+    else:
+        # Voting still open - show current leader
+        if len(leaders) == 1:
+            chosen_one = leaders[0]
+            messages.append(("success", "🏆 CURRENT WINNER!"))
+            messages.append(("success", f"🎉 **{chosen_one}** is leading with {top_votes} votes!"))
+            messages.append(("write", "⚠️ *But voting is still open - this could change!* ⚠️"))
         else:
-            st.warning("🔒 Voting has closed!")
-            st.info("The nomination period ended on Tuesday, August 12th, 2025")
+            # Current tie
+            messages.append(("info", f"🤝 CURRENT TIE! {len(leaders)} brave souls with {top_votes} votes each!"))
+            messages.append(("write", "🎲 *If voting ended now, we'd need a coin flip!*"))
+            chosen_one = stable_choice(sorted(leaders), "winner", *sorted(leaders))  # Pick one for the announcement preview
+
+    # Victory speeches (always show current leader's)
+    speech = stable_choice(victory_speech_templates, "speech", chosen_one, top_votes)
+    messages.append(("write", speech.format(name=chosen_one)))
+
+    messages.append(("markdown", "🎪" * 20))
+    messages.append(("markdown", "### 📣 OFFICIAL ANNOUNCEMENT:"))
+    if voting_open:
+        messages.append(("info", f"🏕️ **{chosen_one} and Greg** are currently set to be the Early Bird Infiltration Team!"))
+        messages.append(("warning", "⚠️ *Subject to change until voting closes on August 12th, 2025*"))
+    else:
+        messages.append(("success", f"🏕️ **{chosen_one} and Greg** will be the official Early Bird Infiltration Team!"))
+
+    messages.append(("info", "⏰ **Mission time:** Approximately 4:30 AM (or whenever Greg's alarm goes off)"))
+    messages.append(("info", "🎯 **Mission objective:** Secure the sacred campsite spot"))
+    messages.append(("info", "🤝 **Mission support:** Everyone else sleeps in and arrives fashionably late"))
+    messages.append(("markdown", "🎪" * 20))
+
+    # Back-to-back messages of the same kind share one element
+    merged = []
+    for kind, text in messages:
+        if merged and merged[-1][0] == kind and kind in ("success", "info", "write"):
+            merged[-1] = (kind, merged[-1][1] + "\n\n" + text)
+        else:
+            merged.append((kind, text))
+    return chosen_one, tuple(merged)
+
+# Once voting has closed no new votes can arrive, so the results stop polling
+@st.fragment(run_every=10 if time.time() < DEADLINE_TS else None)
+def live_results(voting_open):
+    """Roster, live results and announcement; reruns on its own every 10s to sync votes while voting is open"""
+    # run_every was fixed when this page loaded; once the deadline passes, rerun the
+    # whole app once so the closed layout (and a fragment that no longer polls) takes over
+    if voting_open and time.time() >= DEADLINE_TS:
+        st.rerun()
+
+    refresh_state()
+    # Bind the session lookups used below once rather than on every access
+    nominations = st.session_state.nominations
+    write_in_candidates = st.session_state.write_in_candidates
+
+    # Random picks are keyed on the vote count so they only change when votes do
+    total_votes = sum(nominations.values())
+
+    # Sort once per rerun; the live results and the announcement both use it
+    sorted_nominations = nominations.most_common()
 
     # Main content area
     col1, col2 = st.columns([1, 1])
@@ -259,62 +726,29 @@ def main():
     # Nominee roster
     with col1:
         st.header("📋 OFFICIAL NOMINEE ROSTER")
-        for i, nominee in enumerate(eligible_nominees, 1):
-            st.write(f"**{i}. {nominee}**")
-            st.write(f"   *{nominee_profiles[nominee]}*")
-
-        st.write("🖊️ *Write-in candidates welcome! (In case we forgot someone important)*")
-        st.write("🤔 *Remember: Amp is busy with mothering Wolfie*")
-        st.write("⏰ *Dome, Micky and baby Wanda won't arrive in time*")
+        st.markdown(roster_markdown())
 
     # Live results
     with col2:
         st.header("🎪 LIVE RESULTS")
 
-        if st.session_state.nominations:
-            # Sort nominations
-            sorted_nominations = sorted(st.session_state.nominations.items(), 
-                                      key=lambda x: x[1], reverse=True)
-
-            position_emojis = ["🥇", "🥈", "🥉", "🏅", "🎖️", "🏆", "⭐", "🌟"]
-
-            for i, (nominee, votes) in enumerate(sorted_nominations):
-                emoji = position_emojis[min(i, len(position_emojis)-1)]
-                vote_text = "vote" if votes == 1 else "votes"
-
-                if votes >= 2:
-                    status = "🚨 DANGER ZONE! 🚨"
-                    status_color = "red"
-                elif votes == 1:
-                    status = "⚠️ In the running"
-                    status_color = "orange"
-                else:
-                    status = "😅 Safe for now"
-                    status_color = "green"
-
-                st.markdown(f"{emoji} **{nominee}**: {votes} {vote_text}")
-                st.markdown(f"<span style='color:{status_color}'>{status}</span>", 
-                           unsafe_allow_html=True)
-
-                if nominee in st.session_state.write_in_candidates:
-                    st.write("   📝 *(Write-in candidate - thinking outside the tent!)*")
-
-                # Show nomination reasons (without names)
-                if nominee in st.session_state.get('nomination_reasons', {}):
-                    for reason in st.session_state.nomination_reasons[nominee]:
-                        st.write(f"   💭 *\"{reason}\"*")
-
-                st.write("")
+        if nominations:
+            reasons = st.session_state.nomination_reasons
+            st.markdown(render_leaderboard(
+                tuple(sorted_nominations),
+                frozenset(write_in_candidates),
+                tuple(tuple(reasons.get(nominee, ())) for nominee, _ in sorted_nominations),
+            ), unsafe_allow_html=True)
 
             # Stats
             st.markdown("---")
             col_stats1, col_stats2 = st.columns(2)
             with col_stats1:
-                st.metric("📈 Total Votes", sum(st.session_state.nominations.values()))
-                st.metric("👥 Nominators", len(set(st.session_state.nominators)))
+                st.metric("📈 Total Votes", total_votes)
+                st.metric("👥 Nominators", len(st.session_state.nominators))
             with col_stats2:
-                st.metric("🎯 Candidates", len(st.session_state.nominations))
-                st.metric("📝 Write-ins", len(st.session_state.write_in_candidates))
+                st.metric("🎯 Candidates", len(nominations))
+                st.metric("📝 Write-ins", len(write_in_candidates))
         else:
             if voting_open:
                 st.info("🤔 No nominations yet! Someone needs to step up and cast the first vote...")
@@ -322,73 +756,19 @@ def main():
                 st.info("🤔 No nominations were cast before the deadline.")
 
     # Live Winner Announcement Section (shows after first vote)
-    if st.session_state.nominations:
+    if nominations:
         st.markdown("---")
-        leaders, top_votes = get_current_leader()
+        leaders, top_votes = get_current_leader(sorted_nominations)
         
         # Always show the dramatic announcement (updates live until deadline)
-        st.header("🎭 THE MOMENT OF TRUTH... SO FAR! 🎭")
-        st.markdown("🎪" * 30)
-        
-        if not voting_open:
-            # Voting is closed - final results
-            if len(leaders) == 1:
-                chosen_one = leaders[0]
-                st.success("🏆 FINAL WINNER!")
-                st.success(f"🎉 **{chosen_one}** has been selected by popular vote with {top_votes} votes!")
-            else:
-                # Handle final tie with dramatic selection
-                chosen_one = random.choice(leaders)
-                st.info(f"🤝 FINAL TIE! {len(leaders)} brave souls with {top_votes} votes each!")
-                st.success("🎯 THE DICE HAVE SPOKEN!")
-                st.success(f"🏆 **{chosen_one}** has been randomly selected as the final winner!")
-        else:
-            # Voting still open - show current leader
-            if len(leaders) == 1:
-                chosen_one = leaders[0]
-                st.success("🏆 CURRENT WINNER!")
-                st.success(f"🎉 **{chosen_one}** is leading with {top_votes} votes!")
-                st.write("⚠️ *But voting is still open - this could change!* ⚠️")
-            else:
-                # Current tie
-                st.info(f"🤝 CURRENT TIE! {len(leaders)} brave souls with {top_votes} votes each!")
-                st.write("🎲 *If voting ended now, we'd need a coin flip!*")
-                chosen_one = random.choice(leaders)  # Pick one for the announcement preview
-
-        # Victory speeches (always show current leader's)
-        victory_speeches = [
-            f"🎤 {chosen_one}: 'I'd like to thank my agent, my coffee maker, and whoever nominated me...'",
-            f"🎤 {chosen_one}: 'This is either the greatest honor or the worst luck of my life!'",
-            f"🎤 {chosen_one}: 'I promise to sneak responsibly and secure that campsite!'",
-            f"🎤 {chosen_one}: 'Greg, I hope you have a good alarm clock!'",
-            f"🎤 {chosen_one}: 'Well, someone had to do it. Might as well be me!'"
-        ]
-        st.write(random.choice(victory_speeches))
-
-        st.markdown("🎪" * 20)
-        st.markdown("### 📣 OFFICIAL ANNOUNCEMENT:")
-        if voting_open:
-            st.info(f"🏕️ **{chosen_one} and Greg** are currently set to be the Early Bird Infiltration Team!")
-            st.warning("⚠️ *Subject to change until voting closes on August 12th, 2025*")
-        else:
-            st.success(f"🏕️ **{chosen_one} and Greg** will be the official Early Bird Infiltration Team!")
-        
-        st.info("⏰ **Mission time:** Approximately 4:30 AM (or whenever Greg's alarm goes off)")
-        st.info("🎯 **Mission objective:** Secure the sacred campsite spot")
-        st.info("🤝 **Mission support:** Everyone else sleeps in and arrives fashionably late")
-        st.markdown("🎪" * 20)
+        chosen_one, messages = announcement(tuple(leaders), top_votes, voting_open)
+        for kind, text in messages:
+            getattr(st, kind)(text)
 
         # Folk festival wisdom (only show after voting closes)
         if not voting_open:
             with st.expander("📜 FINAL FESTIVAL WISDOM", expanded=True):
-                folk_wisdom = [
-                    "🎵 Remember: 'The times they are a-changin'... but the campsite tradition stays the same!' 🎵",
-                    "🎸 'Blowin' in the wind' is just the morning breeze at 4:30 AM! 🎸",
-                    "🪕 'This land is your land'... but this campsite is OURS! 🪕",
-                    "🎺 'We shall overcome'... the security guards and claim our spot! 🎺"
-                ]
-
-                st.markdown(random.choice(folk_wisdom))
+                st.markdown(stable_choice(folk_wisdom, "wisdom", chosen_one))
                 st.markdown("""
                 **Final reminders:**
                 - 🌅 Early bird gets the worm... and the best camping spot!
@@ -401,34 +781,84 @@ def main():
                 🏕️ **See you all at the sacred campsite... whenever you decide to roll out of bed!** 🏕️
                 """)
 
-    # Enhanced admin controls with nominator list
+@st.fragment
+def admin_panel():
+    """Advanced options; entering the code only reruns this fragment"""
     if st.session_state.nominations and st.checkbox("🎭 Show advanced options"):
         admin_code = st.text_input("Enter code:", type="password", placeholder="4-digit code")
         
         # Show nominators list when correct code is entered
-        if admin_code == "1320":
+        if is_admin_code(admin_code):
             st.success("🔓 Admin access granted")
             
             # Display nominator list
             st.subheader("👥 Complete Nominator List:")
             if st.session_state.nominators:
-                for i, nominator in enumerate(st.session_state.nominators, 1):
+                for i, nominator in enumerate(sorted(st.session_state.nominators), 1):
                     st.write(f"{i}. {nominator}")
             else:
                 st.write("No nominators yet")
             
             # Reset button
             if st.button("Reset data", type="secondary"):
-                st.session_state.nominations = defaultdict(int)
-                st.session_state.nominators = []
-                st.session_state.write_in_candidates = set()
-                st.session_state.nomination_reasons = {}
-                save_data()
-                st.success("Data reset successfully.")
-                time.sleep(1)
+                _apply_event(st.session_state, {"reset": True})
+                save_data({"reset": True})
+                # The panel hides once the votes are gone, so show the notice in the sidebar after the rerun
+                st.session_state.vote_flash = {
+                    "messages": [("success", "Data reset successfully.")],
+                    "balloons": False,
+                }
                 st.rerun()
-        elif admin_code and admin_code != "1320":
+        elif admin_code:
             st.error("Invalid code.")
 
+def main():
+    # Header
+    st.title("🎵🏕️ PHILADELPHIA FOLK FESTIVAL EARLY INFILTRATION NOMINATION SYSTEM 🏕️🎵")
+
+    # Check voting deadline
+    voting_open = time.time() < DEADLINE_TS
+    days_left = days_until_deadline()
+
+    st.markdown("---")
+
+    # Mission briefing
+    with st.expander("🎪 THE MISSION BRIEFING", expanded=True):
+        st.markdown(f"""
+            **Welcome to the annual tradition nobody wants but somebody must do!**
+
+            Every year, two brave souls must sneak into the festival early (normally it comes down to - who's going with Greg!?)
+            to secure the sacred campsite that has been our home away from home.
+
+            🎪 **The Mission:** Arrive before dawn, act casual, claim the spot  
+            🎸 **The Risk:** Getting caught by security and having to explain why  
+            🏕️ **The Reward:** Being a hero... and internal bragging rights of course  
+
+            **Let the nominations begin! May the odds be ever in someone else's favor.**
+        
+            ⏰ **Voting Deadline:** Tuesday, August 12th, 2025 at 11:59 PM
+            {"🗳️ **Status:** VOTING OPEN" if voting_open else "🔒 **Status:** VOTING CLOSED"}
+            {f"({days_left} days remaining)" if voting_open and days_left > 0 else ""}
+            """)
+
+    # Auto-refresh every 10 seconds to get latest votes
+    if st.button("🔄 Refresh Results", help="Click to see latest votes from all devices"):
+        _expire_fetch()
+        st.rerun()
+
+    # Results below refresh themselves while voting is open (see live_results)
+    if voting_open:
+        st.info("📱 App auto-refreshes to sync votes across all devices")
+
+    # Sidebar for nominations
+    with st.sidebar:
+        voting_form()
+
+    # Main content area (auto-refreshing)
+    live_results(voting_open)
+
+    # Enhanced admin controls with nominator list
+    admin_panel()
+
 if __name__ == "__main__":
     main() 